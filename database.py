@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, DateTime
+from sqlalchemy import event, inspect, text, Column, Integer, SmallInteger, String, Text, Boolean, DateTime, Index
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from datetime import datetime
+import enum
 import os
 
 # For development, use SQLite (no setup needed)
@@ -12,14 +13,53 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./stories.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+# Use the asyncio drivers so queries don't tie up a threadpool worker
+if DATABASE_URL.startswith("postgresql://"):
+    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+elif DATABASE_URL.startswith("sqlite://"):
+    DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+if IS_SQLITE:
+    engine = create_async_engine(
+        DATABASE_URL,
+        query_cache_size=1200
+    )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run alongside the writer; mmap serves reads from mapped pages
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.close()
+else:
+    engine = create_async_engine(
+        DATABASE_URL,
+        pool_size=20,
+        max_overflow=10,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        query_cache_size=1200
+    )
+
+# Keep attributes loaded after commit; async sessions can't lazy-load them back
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+# Story categories are a closed set, stored as small ints instead of strings
+class Category(enum.IntEnum):
+    Love = 0
+    Wisdom = 1
+    Regret = 2
+    Joy = 3
+    Pain = 4
+    Change = 5
+    Other = 6
+
 # Define the Story model
 class Story(Base):
     __tablename__ = "stories"
@@ -29,17 +69,42 @@ class Story(Base):
     author_name = Column(String(255), nullable=True)
     author_email = Column(String(255), nullable=True)
     story_text = Column(Text, nullable=False)
-    category = Column(String(50), nullable=False)
+    category = Column(SmallInteger, nullable=False)  # Category value
     approved = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+    # Serve the approved and admin newest-first listings from indexes
+    __table_args__ = (
+        Index("ix_stories_approved_created", "approved", created_at.desc()),
+        Index("ix_stories_created_id", created_at.desc(), id.desc()),
+    )
+
+def migrate_category_names(conn):
+    """
+    Databases created before categories were ints have a VARCHAR column holding names.
+    Rewrite the names as their ints, and change the column type where the backend can.
+    SQLite keeps the VARCHAR column, so its values read back as numeric strings.
+    """
+    columns = {column["name"]: column["type"] for column in inspect(conn).get_columns("stories")}
+    if not isinstance(columns["category"], String):
+        return
+    
+    conn.execute(
+        text("UPDATE stories SET category = :value WHERE category = :name"),
+        [{"value": str(category.value), "name": category.name} for category in Category]
+    )
+    if conn.dialect.name != "sqlite":
+        conn.execute(text("ALTER TABLE stories ALTER COLUMN category TYPE SMALLINT USING category::smallint"))
+
+async def init_db():
+    """Create tables and migrate old data (called once at app startup)"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(migrate_category_names)
+        # Category is filtered in Python now, so this index only slowed down writes
+        await conn.execute(text("DROP INDEX IF EXISTS ix_stories_category_approved"))
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -1,22 +1,37 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from datetime import datetime
-from database import get_db, engine, Base, Story
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from datetime import datetime, timezone
+from typing import Optional
+from pydantic import TypeAdapter
+from database import get_db, init_db, Category, Story
 from models import StoryCreate, StoryResponse, StoryAdmin
-from better_profanity import profanity
+from validation import analyze
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import multiprocessing
 import random
+import time
 
-# Create tables on startup
-Base.metadata.create_all(bind=engine)
-
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create tables on startup
+    await init_db()
+    
+    # Story checks are pure CPU work, so run them in worker processes where they don't
+    # contend for the GIL. Spawned (not forked) workers don't inherit the DB driver threads.
+    with ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn")) as pool:
+        app.state.pool = pool
+        yield
 
-app = FastAPI(title="Strangers with Stories")
 
-# Initialize profanity filter
-profanity.load_censor_words()
+app = FastAPI(title="Strangers with Stories", lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Allow CORS for your frontend (adjust later for security)
 app.add_middleware(
@@ -30,43 +45,27 @@ app.add_middleware(
 # Serve static files
 app.mount("/static", StaticFiles(directory="public"), name="static")
 
-ALLOWED_CATEGORIES = ["Love", "Wisdom", "Regret", "Joy", "Pain", "Change", "Other"]
+# Category names the API accepts, mapped to the ints stored in the database
+ALLOWED_CATEGORIES = {category.name: category.value for category in Category}
 
+# Columns the list endpoints actually serialize (skips updated_at, and email for the public list)
+PUBLIC_LIST_COLUMNS = load_only(
+    Story.id, Story.title, Story.author_name, Story.story_text,
+    Story.category, Story.created_at, Story.approved
+)
+ADMIN_LIST_COLUMNS = load_only(
+    Story.id, Story.title, Story.author_name, Story.author_email, Story.story_text,
+    Story.category, Story.created_at, Story.approved
+)
 
-# ===== FILE SERVING =====
+# Validate and dump whole pages in one call instead of per-row response_model handling
+STORY_LIST_ADAPTER = TypeAdapter(list[StoryResponse])
 
-def is_legitimate_story(text: str) -> bool:
-    """
-    Basic check for gibberish/spam stories.
-    Returns False if story looks like spam.
-    """
-    # Must be at least 10 characters (already validated in models, but double-check)
-    if len(text.strip()) < 10:
-        return False
-    
-    # Check for excessive repeated characters (e.g., "aaaaaaa" or "!!!!!!!")
-    for char in text:
-        if text.count(char) > len(text) * 0.3:  # More than 30% same character
-            return False
-    
-    # Check for too many non-alphabetic characters (spam often has lots of symbols)
-    non_alpha = sum(1 for c in text if not c.isalnum() and c not in ' .,!?;:\'"—–-')
-    if non_alpha > len(text) * 0.2:  # More than 20% non-standard symbols
-        return False
-    
-    # Check if it's mostly gibberish (words that are too long with no vowels)
-    words = text.split()
-    gibberish_count = 0
-    for word in words:
-        # A real word usually has vowels and isn't too long
-        vowels = sum(1 for c in word.lower() if c in 'aeiou')
-        if len(word) > 8 and vowels == 0:  # Long word with no vowels = probably gibberish
-            gibberish_count += 1
-    
-    if gibberish_count > len(words) * 0.3:  # More than 30% gibberish words
-        return False
-    
-    return True
+# Admin rows are streamed, so they're serialized one at a time
+ADMIN_STORY_ADAPTER = TypeAdapter(StoryAdmin)
+
+
+# ===== FILE SERVING =====
 
 @app.get("/")
 def read_root():
@@ -77,52 +76,118 @@ def admin_dashboard():
     return FileResponse("public/admin.html")
 
 
+# ===== APPROVED STORY CACHE =====
+
+# Approved stories only change when an admin approves or deletes one, so the public
+# endpoints read them from memory. The version guards against a reload that started
+# before an invalidation; the TTL bounds staleness when several workers each hold a copy.
+APPROVED_CACHE_TTL = 60  # seconds
+_approved_cache = {"version": 0, "data": None, "loaded_at": 0.0}
+
+
+async def get_approved_stories(db: AsyncSession) -> dict:
+    """
+    Approved stories keyed by category ("" for all of them).
+    Each entry is (stories, (created_at, id) keys), both oldest first for bisecting.
+    """
+    data = _approved_cache["data"]
+    if data is not None and time.monotonic() - _approved_cache["loaded_at"] < APPROVED_CACHE_TTL:
+        return data
+    
+    version = _approved_cache["version"]
+    rows = (await db.scalars(
+        select(Story).options(PUBLIC_LIST_COLUMNS).where(Story.approved == True)
+        .order_by(Story.created_at, Story.id)
+    )).all()
+    
+    data = {"": ([], [])}
+    for story in STORY_LIST_ADAPTER.validate_python(rows):
+        for key in ("", story.category):
+            stories, keys = data.setdefault(key, ([], []))
+            stories.append(story)
+            keys.append((story.created_at, story.id))
+    
+    if _approved_cache["version"] == version:
+        _approved_cache.update(data=data, loaded_at=time.monotonic())
+    return data
+
+
+def invalidate_approved_stories():
+    """Drop the cached approved stories after a change to the approved set"""
+    _approved_cache["version"] += 1
+    _approved_cache["data"] = None
+
+
 # ===== PUBLIC ENDPOINTS =====
 
 
+def format_cursor(created_at: datetime, story_id: int) -> str:
+    """Keyset cursor for X-Next-Cursor; created_at isn't unique, so the id breaks ties"""
+    return f"{created_at.isoformat()},{story_id}"
+
+
+def parse_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    """Turn an X-Next-Cursor value back into (created_at, id)"""
+    if not cursor:
+        return None
+    try:
+        created_at, story_id = cursor.rsplit(",", 1)
+        created_at, story_id = datetime.fromisoformat(created_at), int(story_id)
+        # Stored timestamps are naive UTC, and the cache can't compare them with aware ones
+        if created_at.tzinfo:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    except (ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, story_id
+
+
+def story_list_response(adapter: TypeAdapter, stories: list, limit: int) -> Response:
+    """Serialize a page of stories and point the client at the next page when this one came back full"""
+    response = Response(
+        content=adapter.dump_json(adapter.validate_python(stories)),
+        media_type="application/json"
+    )
+    if len(stories) == limit:
+        response.headers["X-Next-Cursor"] = format_cursor(stories[-1].created_at, stories[-1].id)
+    return response
+
+
 @app.get("/api/stories", response_model=list[StoryResponse])
-def get_public_stories(
+async def get_public_stories(
     category: str = Query(None),
-    db: Session = Depends(get_db)
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all approved stories, optionally filtered by category"""
-    query = db.query(Story).filter(Story.approved == True).order_by(Story.created_at.desc())
+    """Get a page of approved stories, optionally filtered by category"""
+    if category and category not in ALLOWED_CATEGORIES:
+        raise HTTPException(status_code=400, detail="Invalid category")
     
-    if category:
-        if category not in ALLOWED_CATEGORIES:
-            raise HTTPException(status_code=400, detail="Invalid category")
-        query = query.filter(Story.category == category)
+    cursor = parse_cursor(cursor)
+    stories, keys = (await get_approved_stories(db)).get(category or "", ([], []))
     
-    return query.all()
+    # Stories are oldest first: take the `limit` entries just before the cursor, newest first
+    end = bisect_left(keys, cursor) if cursor else len(stories)
+    page = stories[max(0, end - limit):end][::-1]
+    return story_list_response(STORY_LIST_ADAPTER, page, limit)
 
 @app.get("/api/stories/random")
-def get_random_story(db: Session = Depends(get_db)):
+async def get_random_story(db: AsyncSession = Depends(get_db)):
     """Get a random approved story"""
-    stories = db.query(Story).filter(Story.approved == True).all()
+    stories, _ = (await get_approved_stories(db))[""]
     
     if not stories:
         raise HTTPException(status_code=404, detail="No approved stories yet")
     
-    random_story = random.choice(stories)
-    
-    # Manually construct the response to avoid serialization issues
-    return {
-        "id": random_story.id,
-        "title": random_story.title,
-        "author_name": random_story.author_name,
-        "story_text": random_story.story_text,
-        "category": random_story.category,
-        "created_at": random_story.created_at,
-        "approved": random_story.approved
-    }
+    return random.choice(stories)
 
 @app.get("/api/stories/{story_id}", response_model=StoryResponse)
-def get_story(story_id: int, db: Session = Depends(get_db)):
+async def get_story(story_id: int, db: AsyncSession = Depends(get_db)):
     """Get a single approved story"""
-    story = db.query(Story).filter(
+    story = await db.scalar(select(Story).where(
         Story.id == story_id,
         Story.approved == True
-    ).first()
+    ))
     
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
@@ -131,39 +196,49 @@ def get_story(story_id: int, db: Session = Depends(get_db)):
 
 
 @app.post("/api/stories", response_model=dict)
-def create_story(story: StoryCreate, db: Session = Depends(get_db)):
+async def create_story(story: StoryCreate, db: AsyncSession = Depends(get_db)):
     """Submit a new story"""
     if story.category not in ALLOWED_CATEGORIES:
         raise HTTPException(status_code=400, detail="Invalid category")
     
+    result = await asyncio.get_running_loop().run_in_executor(app.state.pool, analyze, story.story_text)
+    check_analysis(result)
+    story_id = await save_story(db, story)
+    
+    return {"id": story_id, "message": "Story submitted for review"}
+
+
+def check_analysis(result: dict):
+    """Raise a 400 if analyze() flagged the story for profanity or spam"""
     # NEW: Check for profanity
-    if profanity.contains_profanity(story.story_text):
+    if result["profane"]:
         raise HTTPException(
             status_code=400, 
             detail="Your story contains inappropriate language. Please revise and resubmit."
         )
     
     # NEW: Check for spam/gibberish (very short words repeated, all caps, etc.)
-    if not is_legitimate_story(story.story_text):
+    if not result["legit"]:
         raise HTTPException(
             status_code=400,
             detail="Your submission doesn't look like a real story. Please try again."
         )
+
+
+def new_story_values(story: StoryCreate) -> dict:
+    """Column values for a submitted story: unapproved, with the category stored as its int"""
+    return {**story.model_dump(), "category": ALLOWED_CATEGORIES[story.category], "approved": False}
+
+
+async def save_story(db: AsyncSession, story: StoryCreate) -> int:
+    """Insert a submitted story as unapproved and return its id"""
+    # INSERT ... RETURNING gets the id back in the same round-trip
+    story_id = (await db.execute(
+        insert(Story).values(**new_story_values(story)).returning(Story.id)
+    )).scalar_one()
+    await db.commit()
     
-    db_story = Story(
-        title=story.title,
-        author_name=story.author_name,
-        author_email=story.author_email,
-        story_text=story.story_text,
-        category=story.category,
-        approved=False
-    )
-    
-    db.add(db_story)
-    db.commit()
-    db.refresh(db_story)
-    
-    return {"id": db_story.id, "message": "Story submitted for review"}
+    return story_id
 
 
 
@@ -171,34 +246,89 @@ def create_story(story: StoryCreate, db: Session = Depends(get_db)):
 
 
 @app.get("/api/admin/stories", response_model=list[StoryAdmin])
-def get_pending_stories(db: Session = Depends(get_db)):
-    """Get all stories (pending + approved) for admin review"""
-    return db.query(Story).order_by(Story.created_at.desc()).all()
+async def get_pending_stories(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream a page of stories (pending + approved) for admin review"""
+    cursor = parse_cursor(cursor)
+    conditions = [tuple_(Story.created_at, Story.id) < cursor] if cursor else []
+    newest_first = (Story.created_at.desc(), Story.id.desc())
+    
+    # Headers go out before the rows, so pin the page's keys first and stream exactly those
+    # rows; a second keyset query could see a different snapshot and shift the page
+    page_keys = (await db.execute(
+        select(Story.created_at, Story.id).where(*conditions)
+        .order_by(*newest_first).limit(limit)
+    )).all()
+    headers = {}
+    if len(page_keys) == limit:
+        headers["X-Next-Cursor"] = format_cursor(*page_keys[-1])
+    
+    stories = await db.stream_scalars(
+        select(Story).options(ADMIN_LIST_COLUMNS)
+        .where(Story.id.in_([story_id for _, story_id in page_keys]))
+        .order_by(*newest_first)
+        .execution_options(yield_per=50)
+    )
+    return StreamingResponse(
+        stream_json_array(ADMIN_STORY_ADAPTER, stories),
+        media_type="application/json",
+        headers=headers
+    )
+
+
+async def stream_json_array(adapter: TypeAdapter, rows):
+    """Yield a JSON array one serialized row at a time"""
+    yield b"["
+    first = True
+    async for row in rows:
+        yield (b"" if first else b",") + adapter.dump_json(adapter.validate_python(row))
+        first = False
+    yield b"]"
+
+
+@app.post("/api/admin/stories/bulk", response_model=dict)
+async def create_stories_bulk(stories: list[StoryCreate], db: AsyncSession = Depends(get_db)):
+    """Seed many stories (unapproved) in one multi-row INSERT"""
+    if any(story.category not in ALLOWED_CATEGORIES for story in stories):
+        raise HTTPException(status_code=400, detail="Invalid category")
+    
+    if stories:
+        await db.execute(insert(Story), [new_story_values(story) for story in stories])
+        await db.commit()
+    
+    return {"message": f"{len(stories)} stories added for review"}
 
 
 @app.patch("/api/admin/stories/{story_id}/approve")
-def approve_story(story_id: int, db: Session = Depends(get_db)):
+async def approve_story(story_id: int, db: AsyncSession = Depends(get_db)):
     """Approve a story"""
-    story = db.query(Story).filter(Story.id == story_id).first()
+    story = await db.scalar(select(Story).where(Story.id == story_id))
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
     
     story.approved = True
     story.updated_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    
+    invalidate_approved_stories()
     
     return {"message": "Story approved"}
 
 
 @app.delete("/api/admin/stories/{story_id}")
-def reject_story(story_id: int, db: Session = Depends(get_db)):
+async def reject_story(story_id: int, db: AsyncSession = Depends(get_db)):
     """Reject/delete a story"""
-    story = db.query(Story).filter(Story.id == story_id).first()
+    story = await db.scalar(select(Story).where(Story.id == story_id))
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
     
-    db.delete(story)
-    db.commit()
+    await db.delete(story)
+    await db.commit()
+    
+    invalidate_approved_stories()
     
     return {"message": "Story deleted"}
 
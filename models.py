@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 from typing import Optional
 from datetime import datetime
+from database import Category
 
 class StoryCreate(BaseModel):
     """Schema for submitting a new story"""
@@ -20,8 +21,16 @@ class StoryResponse(BaseModel):
     created_at: datetime
     approved: bool = False
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+    
+    @field_validator("category", mode="before")
+    @classmethod
+    def category_name(cls, value):
+        """Categories are stored as ints; the API uses their names"""
+        # Older SQLite databases keep a VARCHAR column, so the int comes back as a string
+        if isinstance(value, str) and value.isdigit():
+            value = int(value)
+        return Category(value).name if isinstance(value, int) else value
 
 class StoryAdmin(StoryResponse):
     """Admin view includes email"""
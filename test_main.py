@@ -0,0 +1,178 @@
+import os
+import sqlite3
+import tempfile
+
+# Point the app at a throwaway database before it is imported
+DB_PATH = f"{tempfile.mkdtemp()}/stories.db"
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+import pytest
+
+from database import engine, migrate_category_names
+from models import StoryResponse
+import main
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def fetch_all_pages(client, url, **params):
+    """Follow X-Next-Cursor until the last page and return every story id"""
+    ids = []
+    cursor = None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids += [story["id"] for story in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+
+def test_old_category_names_are_migrated(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE stories (id INTEGER PRIMARY KEY, title VARCHAR(255), author_name VARCHAR(255), "
+            "author_email VARCHAR(255), story_text TEXT NOT NULL, category VARCHAR(50) NOT NULL, "
+            "approved BOOLEAN, created_at DATETIME, updated_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO stories (story_text, category, approved, created_at) "
+            "VALUES ('An old story', 'Wisdom', 1, '2024-01-01 00:00:00')"
+        ))
+        migrate_category_names(conn)
+        # A new row lands in the VARCHAR column as text, just like the app's inserts
+        conn.execute(text(
+            "INSERT INTO stories (story_text, category, approved, created_at) "
+            "VALUES ('A new story', 0, 1, '2024-01-02 00:00:00')"
+        ))
+        rows = conn.execute(text("SELECT * FROM stories ORDER BY id")).mappings().all()
+    
+    assert [row["category"] for row in rows] == ["1", "0"]
+    assert [StoryResponse.model_validate(dict(row)).category for row in rows] == ["Wisdom", "Love"]
+
+
+def test_submitted_story_round_trips_category(client):
+    story_id = client.post("/api/stories", json={
+        "story_text": "This is a lovely new story about love.",
+        "category": "Love",
+    }).json()["id"]
+    client.patch(f"/api/admin/stories/{story_id}/approve")
+    
+    stories = client.get("/api/stories", params={"category": "Love", "limit": 200}).json()
+    assert story_id in [story["id"] for story in stories]
+    assert all(story["category"] == "Love" for story in stories)
+
+
+def test_paging_keeps_stories_that_share_a_timestamp(client):
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO stories (story_text, category, approved, created_at) VALUES (?, 3, 1, ?)",
+            [(f"Tied story {i}", "2030-01-01 00:00:00.000000") for i in range(20)]
+        )
+    main.invalidate_approved_stories()
+    
+    with sqlite3.connect(DB_PATH) as conn:
+        all_ids = {row[0] for row in conn.execute("SELECT id FROM stories")}
+        approved_ids = {row[0] for row in conn.execute("SELECT id FROM stories WHERE approved = 1")}
+    
+    admin_ids = fetch_all_pages(client, "/api/admin/stories", limit=7)
+    assert len(admin_ids) == len(set(admin_ids))
+    assert set(admin_ids) == all_ids
+    
+    public_ids = fetch_all_pages(client, "/api/stories", limit=7)
+    assert len(public_ids) == len(set(public_ids))
+    assert set(public_ids) == approved_ids
+
+
+def test_paging_returns_every_bulk_seeded_story(client):
+    stories = [{"story_text": f"Bulk seeded story number {i}", "category": "Other"} for i in range(400)]
+    response = client.post("/api/admin/stories/bulk", json=stories)
+    assert response.status_code == 200
+    
+    with sqlite3.connect(DB_PATH) as conn:
+        all_ids = {row[0] for row in conn.execute("SELECT id FROM stories")}
+    
+    admin_ids = fetch_all_pages(client, "/api/admin/stories", limit=7)
+    assert len(admin_ids) == len(all_ids)
+    assert set(admin_ids) == all_ids
+
+
+def test_timezone_aware_cursor_is_accepted(client):
+    for url in ("/api/stories", "/api/admin/stories"):
+        response = client.get(url, params={"cursor": "2020-01-01T00:00:00+00:00,1"})
+        assert response.status_code == 200
+        assert response.json() == []
+    
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO stories (story_text, category, approved, created_at) VALUES (?, 3, 1, ?)",
+            [("Story just before midnight", "2031-05-31 23:00:00.000000"),
+             ("Story at midnight", "2031-06-01 00:00:00.000000")]
+        )
+        ids = dict(conn.execute("SELECT story_text, id FROM stories WHERE created_at LIKE '2031-%'").fetchall())
+    main.invalidate_approved_stories()
+    
+    # 02:00 at +02:00 is midnight UTC, so the midnight story is on the far side of the cursor
+    response = client.get("/api/stories", params={"cursor": "2031-06-01T02:00:00+02:00,0", "limit": 200})
+    assert response.status_code == 200
+    page_ids = [story["id"] for story in response.json()]
+    assert ids["Story just before midnight"] in page_ids
+    assert ids["Story at midnight"] not in page_ids
+
+
+def test_approving_a_story_refreshes_the_public_list(client):
+    story_id = client.post("/api/stories", json={
+        "story_text": "A story waiting for an admin to approve it.",
+        "category": "Joy",
+    }).json()["id"]
+    
+    # Warm the cache while the story is still pending
+    stories = client.get("/api/stories", params={"limit": 200}).json()
+    assert story_id not in [story["id"] for story in stories]
+    
+    client.patch(f"/api/admin/stories/{story_id}/approve")
+    stories = client.get("/api/stories", params={"limit": 200}).json()
+    assert story_id in [story["id"] for story in stories]
+
+
+@pytest.mark.parametrize("cursor", ["yesterday", "0001-01-01T00:00:00+01:00,1"])
+@pytest.mark.parametrize("url", ["/api/stories", "/api/admin/stories"])
+def test_malformed_cursor_is_rejected(client, url, cursor):
+    assert client.get(url, params={"cursor": cursor}).status_code == 400
+
+
+def test_admin_page_is_stable_when_a_story_arrives_mid_request(client):
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO stories (story_text, category, approved, created_at) VALUES (?, 6, 0, ?)",
+            [(f"Pending story {i}", f"2098-01-01 00:00:0{i}.000000") for i in range(1, 7)]
+        )
+        existing_ids = {row[0] for row in conn.execute("SELECT id FROM stories")}
+    
+    # Insert a newer story right after the request's first query runs
+    inserted = []
+    
+    def insert_story(conn, cursor, statement, parameters, context, executemany):
+        if not inserted and statement.startswith("SELECT stories.created_at, stories.id"):
+            with sqlite3.connect(DB_PATH) as other:
+                other.execute(
+                    "INSERT INTO stories (story_text, category, approved, created_at) "
+                    "VALUES ('A story submitted mid-request', 6, 0, '2099-01-01 00:00:00.000000')"
+                )
+            inserted.append(True)
+    
+    event.listen(engine.sync_engine, "after_cursor_execute", insert_story)
+    try:
+        admin_ids = fetch_all_pages(client, "/api/admin/stories", limit=3)
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", insert_story)
+    
+    assert inserted
+    assert existing_ids <= set(admin_ids)
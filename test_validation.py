@@ -0,0 +1,58 @@
+from better_profanity import profanity
+import pytest
+import random
+
+from validation import analyze, contains_profanity
+
+
+SUBSTITUTION_SPELLINGS = [
+    "you are an @ss",
+    "f*ck you",
+    "b1tch please",
+    "pen1s",
+    "tw@t",
+    "$h1t happens",
+    "what the fuck",
+    "a55hole",
+]
+
+CLEAN_TEXT = [
+    "This is a classy assessment of my day",
+    "hello Scunthorpe",
+    "I went to the market and bought some bread",
+    "My grandmother taught me to bake when I was 7",
+    # better_profanity counts these substitution chars as part of the word
+    "I paid $hell money",
+    "*ass*ssment* today",
+    "my h3ll@ friend",
+    "ass's",
+]
+
+
+@pytest.mark.parametrize("text", SUBSTITUTION_SPELLINGS + CLEAN_TEXT)
+def test_contains_profanity_matches_better_profanity(text):
+    assert contains_profanity(text.lower()) == profanity.contains_profanity(text)
+
+
+def test_contains_profanity_matches_better_profanity_on_fuzzed_text():
+    words = ["ass", "hell", "sh1t", "f*ck", "@ss", "$hit", "a$$", "tw@t", "class", "h3ll", "ssment", "bread"]
+    separators = [" ", "  ", "$", "@", "*", "'", '"', ".", ",", "-", "!", ""]
+    rng = random.Random(0)
+    mismatched = []
+    for _ in range(5000):
+        text = "".join(rng.choice(separators) + rng.choice(words) for _ in range(rng.randint(1, 4)))
+        text += rng.choice(separators)
+        if contains_profanity(text.lower()) != profanity.contains_profanity(text):
+            mismatched.append(text)
+    assert mismatched == []
+
+
+def test_every_word_list_entry_is_detected():
+    missed = [str(word) for word in profanity.CENSOR_WORDSET if not contains_profanity(str(word))]
+    assert missed == []
+
+
+def test_analyze_flags_profanity_and_spam():
+    assert analyze("Hello there, this is a real story about my life.") == {"profane": False, "legit": True}
+    assert analyze("f*ck this, it was a terrible day at work")["profane"]
+    assert not analyze("xkcdqwrtzp bcdfghjklm nmnmnmnmnmn")["legit"]
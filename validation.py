@@ -0,0 +1,110 @@
+from better_profanity import profanity
+from better_profanity.constants import ALLOWED_CHARACTERS
+from collections import Counter
+from typing import Optional
+import ahocorasick
+import re
+
+
+def substitution_table(char_map: dict) -> dict:
+    """
+    Translation table folding every character in a substitution group to one representative.
+    Groups that share a variant (e.g. "*" stands for several vowels) are merged.
+    """
+    groups = []
+    for char, variants in char_map.items():
+        group = {char, *variants}
+        for other in [g for g in groups if g & group]:
+            groups.remove(other)
+            group |= other
+        groups.append(group)
+    return str.maketrans({c: min(group) for group in groups for c in group})
+
+
+# Initialize profanity filter: build an Aho-Corasick automaton once from
+# better_profanity's word list so each check is a single pass over the text.
+# Keys and input are both folded through the substitution table, so "@ss" and
+# "b1tch" reach the same key as their plain spellings; each candidate is then
+# confirmed against better_profanity's own variant matching.
+profanity.load_censor_words()
+SUBSTITUTION_TABLE = substitution_table(profanity.CHARS_MAPPING)
+
+_censor_words_by_key = {}
+for censor_word in profanity.CENSOR_WORDSET:
+    key = str(censor_word).translate(SUBSTITUTION_TABLE)
+    _censor_words_by_key.setdefault(key, []).append(censor_word)
+
+PROFANITY_AUTOMATON = ahocorasick.Automaton()
+for key, censor_words in _censor_words_by_key.items():
+    PROFANITY_AUTOMATON.add_word(key, (len(key), censor_words))
+PROFANITY_AUTOMATON.make_automaton()
+
+# Anything that isn't a letter, digit or normal prose punctuation (\w also matches "_", so add it back)
+NON_STANDARD_CHARS = re.compile(r"""[^\w .,!?;:'"—–-]|_""")
+
+# A whitespace-delimited word longer than 8 characters with no vowels (matched on lowercased text)
+GIBBERISH_WORD = re.compile(r"(?<!\S)[^\saeiou]{9,}(?!\S)")
+
+
+def contains_profanity(text_lower: str) -> bool:
+    """
+    Check already-lowercased text against the profanity word list.
+    Only whole-word matches count, so "class" doesn't trip on "ass". Words are split the
+    way better_profanity splits them, where substitution chars like "$" and "@" are word chars.
+    """
+    folded = text_lower.translate(SUBSTITUTION_TABLE)
+    for end, (length, censor_words) in PROFANITY_AUTOMATON.iter(folded):
+        start = end - length + 1
+        if start > 0 and text_lower[start - 1] in ALLOWED_CHARACTERS:
+            continue
+        if end + 1 < len(text_lower) and text_lower[end + 1] in ALLOWED_CHARACTERS:
+            continue
+        candidate = text_lower[start:end + 1]
+        if any(censor_word == candidate for censor_word in censor_words):
+            return True
+    return False
+
+
+def is_legitimate_story(text: str, text_lower: Optional[str] = None) -> bool:
+    """
+    Basic check for gibberish/spam stories.
+    Returns False if story looks like spam. Checks run cheapest first.
+    Pass text_lower when the caller has already lowercased the text.
+    """
+    # Must be at least 10 characters (already validated in models, but double-check)
+    if len(text.strip()) < 10:
+        return False
+    
+    # Check for too many non-alphabetic characters (spam often has lots of symbols)
+    non_alpha = len(NON_STANDARD_CHARS.findall(text))
+    if non_alpha > len(text) * 0.2:  # More than 20% non-standard symbols
+        return False
+    
+    # Check for excessive repeated characters (e.g., "aaaaaaa" or "!!!!!!!")
+    counts = Counter(text)
+    if counts and max(counts.values()) > len(text) * 0.3:  # More than 30% same character
+        return False
+    
+    # Check if it's mostly gibberish (words that are too long with no vowels)
+    # A real word usually has vowels and isn't too long
+    if text_lower is None:
+        text_lower = text.lower()
+    words = text_lower.split()
+    gibberish_count = len(GIBBERISH_WORD.findall(text_lower))
+    
+    if gibberish_count > len(words) * 0.3:  # More than 30% gibberish words
+        return False
+    
+    return True
+
+
+def analyze(text: str) -> dict:
+    """
+    Run every submission check over the story in one call.
+    Returns {"profane": bool, "legit": bool}.
+    """
+    text_lower = text.lower()
+    return {
+        "profane": contains_profanity(text_lower),
+        "legit": is_legitimate_story(text, text_lower),
+    }